@@ -0,0 +1,276 @@
+"""
+Offline batch mode: runs the Touchpad gesture pipeline over directories of recorded videos.
+
+Each video is decoded once by a worker process, its hand landmarks are extracted with the same
+MediaPipe settings as the live controller, and every parameter combination of the sweep is then
+replayed over those landmarks with input dispatch disabled.
+
+Usage:
+    python batch_gestures.py recordings/ --out batch_results --zoom-threshold 20 30 40 --persistence-frames 3 5
+"""
+import argparse
+import csv
+import hashlib
+import itertools
+import multiprocessing
+import os
+
+import cv2
+import mediapipe as mp
+
+from gestures import (CLICK_DISTANCE, COOLDOWN_TIME, PERSISTENCE_FRAMES, SLIDE_THRESHOLD,
+                      TOUCHPAD_EVENTS, ZOOM_THRESHOLD, TouchpadGestures, hand_to_pixels)
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.webm')
+DEFAULT_FPS = 30.0
+
+PARAM_COLUMNS = ['ZOOM_THRESHOLD', 'SLIDE_THRESHOLD', 'CLICK_DISTANCE', 'PERSISTENCE_FRAMES', 'FRAME_SIZE']
+SUMMARY_COLUMNS = ['video', 'config'] + PARAM_COLUMNS + ['frames', 'hand_frames', 'duration'] + TOUCHPAD_EVENTS
+AGGREGATE_COLUMNS = ['config'] + PARAM_COLUMNS + ['videos', 'frames', 'hand_frames', 'duration'] + \
+                    TOUCHPAD_EVENTS + ['events_per_minute']
+
+# One MediaPipe Hands instance per worker process, created by init_worker()
+_hands = None
+
+
+def init_worker():
+    """Pool initializer: build this worker's MediaPipe Hands instance."""
+    global _hands
+    cv2.setNumThreads(1) # One video per core; keep OpenCV from oversubscribing
+    _hands = mp.solutions.hands.Hands(
+        max_num_hands=2,
+        min_detection_confidence=0.7,
+        min_tracking_confidence=0.5
+    )
+
+
+def config_name(params, frame_size):
+    """
+    Short stable name for one parameter combination, e.g. 'z30-s40-c40-p5-f1920x1080'.
+
+    The thresholds are in pixels, so the frame size the landmarks are mapped to is part of the name.
+    """
+    return "z{:g}-s{:g}-c{:g}-p{:d}-f{:d}x{:d}".format(*params, *frame_size)
+
+
+def find_videos(directories):
+    """
+    Return the sorted absolute paths of all video files in the given directories.
+
+    A video reached through repeated or overlapping directories is only listed once.
+    """
+    videos = {}
+    for directory in directories:
+        for name in sorted(os.listdir(directory)):
+            path = os.path.abspath(os.path.join(directory, name))
+            if os.path.isfile(path) and name.lower().endswith(VIDEO_EXTENSIONS):
+                videos[path] = None
+    return list(videos)
+
+
+def extract_landmarks(video_path, frame_width, frame_height):
+    """
+    Decode a video and return (fps, frames), where each frame is the first hand's
+    landmark list in pixel coordinates, or None when no hand was detected.
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Could not open video: {video_path}")
+
+    fps = cap.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS
+    _hands.reset() # Don't carry hand tracking over from the previous video
+
+    frames = []
+    while True:
+        success, frame = cap.read()
+        if not success:
+            break
+
+        # Same preprocessing as the live controller
+        rgb_frame = cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB)
+        results = _hands.process(rgb_frame)
+
+        if results.multi_hand_landmarks:
+            frames.append(hand_to_pixels(results.multi_hand_landmarks[0], frame_width, frame_height))
+        else:
+            frames.append(None)
+
+    cap.release()
+    return fps, frames
+
+
+def replay(frames, fps, params):
+    """Run the Touchpad gestures over extracted landmarks; return the (frame, time, event) timeline."""
+    zoom_threshold, slide_threshold, click_distance, persistence_frames = params
+    touchpad = TouchpadGestures(zoom_threshold, slide_threshold, click_distance, persistence_frames, COOLDOWN_TIME)
+    last_action_time = -COOLDOWN_TIME - 1 # Allow an action on the very first frame
+
+    timeline = []
+    for frame_idx, lm_list in enumerate(frames):
+        if lm_list is None:
+            touchpad.reset()
+            continue
+
+        now = frame_idx / fps
+        for event in touchpad.update(lm_list, now, last_action_time):
+            timeline.append((frame_idx, now, event))
+            last_action_time = now
+    return timeline
+
+
+def process_video(job):
+    """Worker task: extract landmarks once, then replay every requested configuration."""
+    video_path, configs, frame_width, frame_height, events_dir = job
+    try:
+        fps, frames = extract_landmarks(video_path, frame_width, frame_height)
+        hand_frames = sum(1 for lm_list in frames if lm_list is not None)
+        duration = len(frames) / fps
+
+        rows = []
+        for params in configs:
+            name = config_name(params, (frame_width, frame_height))
+            timeline = replay(frames, fps, params)
+
+            config_dir = os.path.join(events_dir, name)
+            os.makedirs(config_dir, exist_ok=True)
+            events_path = os.path.join(config_dir, timeline_name(video_path))
+            with open(events_path + ".tmp", 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['frame', 'time', 'event'])
+                for frame_idx, now, event in timeline:
+                    writer.writerow([frame_idx, f"{now:.3f}", event])
+            os.replace(events_path + ".tmp", events_path) # Only complete timelines ever appear on disk
+
+            row = {'video': video_path, 'config': name, 'frames': len(frames),
+                   'hand_frames': hand_frames, 'duration': f"{duration:.3f}"}
+            row.update(zip(PARAM_COLUMNS, params + (f"{frame_width}x{frame_height}",)))
+            row.update({event: 0 for event in TOUCHPAD_EVENTS})
+            for _, _, event in timeline:
+                row[event] += 1
+            rows.append(row)
+    except Exception as e:
+        # Report the failure for this video only; the pool carries on with the others
+        return video_path, None, str(e)
+
+    return video_path, rows, None
+
+
+def timeline_name(video_path):
+    """File name of a video's event timeline; a hash of the absolute path keeps it unique."""
+    path_hash = hashlib.sha1(video_path.encode('utf-8')).hexdigest()[:12]
+    return f"{os.path.basename(video_path)}.{path_hash}.events.csv"
+
+
+def load_completed(summary_path):
+    """Read an existing summary file and return {video: set of finished config names}."""
+    completed = {}
+    if os.path.exists(summary_path):
+        with open(summary_path, newline='') as f:
+            for row in csv.DictReader(f):
+                completed.setdefault(row['video'], set()).add(row['config'])
+    return completed
+
+
+def write_aggregate(summary_path, aggregate_path):
+    """Total the per-video summary rows into one row per configuration; return the row count."""
+    totals = {}
+    with open(summary_path, newline='') as f:
+        for row in csv.DictReader(f):
+            total = totals.get(row['config'])
+            if total is None:
+                total = {column: row[column] for column in PARAM_COLUMNS}
+                total.update({'config': row['config'], 'videos': 0, 'frames': 0, 'hand_frames': 0, 'duration': 0.0})
+                total.update({event: 0 for event in TOUCHPAD_EVENTS})
+                totals[row['config']] = total
+
+            total['videos'] += 1
+            total['frames'] += int(row['frames'])
+            total['hand_frames'] += int(row['hand_frames'])
+            total['duration'] += float(row['duration'])
+            for event in TOUCHPAD_EVENTS:
+                total[event] += int(row[event])
+
+    with open(aggregate_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=AGGREGATE_COLUMNS)
+        writer.writeheader()
+        for name in sorted(totals):
+            total = totals[name]
+            event_count = sum(total[event] for event in TOUCHPAD_EVENTS)
+            minutes = total['duration'] / 60
+            total['events_per_minute'] = f"{event_count / minutes:.2f}" if minutes > 0 else "0.00"
+            total['duration'] = f"{total['duration']:.3f}"
+            writer.writerow(total)
+    return len(totals)
+
+
+def parse_frame_size(value):
+    """argparse type for 'WIDTHxHEIGHT'."""
+    try:
+        width, height = value.lower().split('x')
+        return int(width), int(height)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got '{value}'")
+
+
+def main():
+    """
+    Parse arguments, fan the videos out across a process pool and stream results to disk.
+    """
+    parser = argparse.ArgumentParser(description="Run the gesture pipeline offline over directories of recorded videos.")
+    parser.add_argument('directories', nargs='+', help="Directories containing video files")
+    parser.add_argument('--out', default='batch_results', help="Output directory (default: batch_results)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Worker processes (default: all cores)")
+    parser.add_argument('--frame-size', type=parse_frame_size, default=(1920, 1080),
+                        help="Pixel space the landmarks are mapped to, normally the screen size (default: 1920x1080)")
+    parser.add_argument('--zoom-threshold', type=float, nargs='+', default=[ZOOM_THRESHOLD])
+    parser.add_argument('--slide-threshold', type=float, nargs='+', default=[SLIDE_THRESHOLD])
+    parser.add_argument('--click-distance', type=float, nargs='+', default=[CLICK_DISTANCE])
+    parser.add_argument('--persistence-frames', type=int, nargs='+', default=[PERSISTENCE_FRAMES])
+    args = parser.parse_args()
+
+    for directory in args.directories:
+        if not os.path.isdir(directory):
+            parser.error(f"not a directory: '{directory}'")
+
+    # Parameter sweep: every combination of the values given on the command line
+    configs = list(itertools.product(args.zoom_threshold, args.slide_threshold,
+                                     args.click_distance, args.persistence_frames))
+
+    events_dir = os.path.join(args.out, 'events')
+    os.makedirs(events_dir, exist_ok=True)
+    summary_path = os.path.join(args.out, 'summary.csv')
+    aggregate_path = os.path.join(args.out, 'aggregate.csv')
+
+    # Resume: skip configurations already recorded in the summary by a previous run
+    completed = load_completed(summary_path)
+    jobs = []
+    for video_path in find_videos(args.directories):
+        pending = [params for params in configs if config_name(params, args.frame_size) not in completed.get(video_path, set())]
+        if pending:
+            jobs.append((video_path, pending, args.frame_size[0], args.frame_size[1], events_dir))
+
+    print(f"{len(jobs)} video(s) to process, {len(configs)} configuration(s), {args.workers} worker(s).")
+
+    write_header = not os.path.exists(summary_path)
+    with open(summary_path, 'a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS)
+        if write_header:
+            writer.writeheader()
+
+        if jobs:
+            with multiprocessing.Pool(processes=args.workers, initializer=init_worker) as pool:
+                for done, (video_path, rows, error) in enumerate(pool.imap_unordered(process_video, jobs), 1):
+                    if error is not None:
+                        print(f"[{done}/{len(jobs)}] Error processing {video_path}: {error}")
+                        continue
+                    writer.writerows(rows)
+                    f.flush() # Stream results so an interrupted run can resume here
+                    print(f"[{done}/{len(jobs)}] {video_path}")
+
+    config_count = write_aggregate(summary_path, aggregate_path)
+    print(f"Summary written to {summary_path}")
+    print(f"Aggregate statistics written to {aggregate_path} ({config_count} configuration(s))")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import os
+
+import numpy as np
+
+# --- Template Matching Constants ---
+TEMPLATE_K = 3 # Nearest templates that vote on a match
+TEMPLATE_MAX_DISTANCE = 0.6 # Max feature distance for a template to count as a match
+FEATURE_SIZE = 42 # 21 landmarks x (x, y)
+
+
+def normalize_landmarks(lm_list):
+    """
+    Turn a 21-point landmark list into a translation, scale and rotation invariant feature vector.
+
+    The wrist is moved to the origin, the hand is scaled so the wrist to middle finger base
+    distance is 1, and rotated so that segment points straight up. Returns None for a degenerate hand.
+    """
+    points = np.asarray(lm_list, dtype=np.float32)
+    points = points - points[0]
+
+    scale = np.linalg.norm(points[9])
+    if scale < 1e-6:
+        return None
+    points /= scale
+
+    # Rotation that maps the wrist -> middle finger base direction onto (0, -1)
+    vx, vy = points[9]
+    rotation = np.array([[-vy, vx], [-vx, -vy]], dtype=np.float32)
+    return (points @ rotation.T).ravel()
+
+
+class TemplateClassifier:
+    """
+    k-nearest-neighbour matcher over a library of recorded hand pose templates.
+
+    Each template is a normalized feature vector with an action label. All templates are stored in
+    one matrix so a frame is classified with a single batched distance computation.
+    """
+    def __init__(self, k=TEMPLATE_K, max_distance=TEMPLATE_MAX_DISTANCE):
+        self.k = k
+        self.max_distance = max_distance
+        self.labels = np.empty(0, dtype=str)
+        self._features = np.empty((0, FEATURE_SIZE), dtype=np.float32)
+        self._sq_norms = np.empty(0, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def add(self, label, features):
+        """Add one template to the library."""
+        features = np.asarray(features, dtype=np.float32).reshape(1, FEATURE_SIZE)
+        self.labels = np.append(self.labels, label)
+        self._features = np.vstack([self._features, features])
+        self._sq_norms = np.einsum('ij,ij->i', self._features, self._features)
+
+    def counts(self):
+        """Return {label: number of templates}."""
+        labels, counts = np.unique(self.labels, return_counts=True)
+        return dict(zip(labels.tolist(), counts.tolist()))
+
+    def classify(self, features):
+        """Return the label of the best matching templates, or None if nothing is close enough."""
+        if features is None or len(self.labels) == 0:
+            return None
+
+        # Squared distances to every template at once: |t|^2 - 2 t.f + |f|^2
+        features = np.asarray(features, dtype=np.float32)
+        sq_dists = self._sq_norms - 2 * (self._features @ features) + features @ features
+
+        k = min(self.k, len(sq_dists))
+        nearest = np.argpartition(sq_dists, k - 1)[:k]
+        nearest = nearest[sq_dists[nearest] <= self.max_distance ** 2]
+        if len(nearest) == 0:
+            return None
+
+        # Majority vote, ties going to the label of the closest template
+        nearest = nearest[np.argsort(sq_dists[nearest])]
+        labels, first_index, votes = np.unique(self.labels[nearest], return_index=True, return_counts=True)
+        best = np.lexsort((first_index, -votes))[0]
+        return str(labels[best])
+
+    def save(self, path):
+        """Write the template library to an .npz file."""
+        np.savez(path, labels=self.labels, features=self._features)
+
+    @classmethod
+    def load(cls, path, k=TEMPLATE_K, max_distance=TEMPLATE_MAX_DISTANCE):
+        """Load a template library saved by save(); a missing file gives an empty classifier."""
+        classifier = cls(k, max_distance)
+        if os.path.exists(path):
+            with np.load(path) as data:
+                classifier.labels = data['labels']
+                classifier._features = data['features'].astype(np.float32)
+            classifier._sq_norms = np.einsum('ij,ij->i', classifier._features, classifier._features)
+        return classifier
@@ -0,0 +1,157 @@
+import math
+
+# --- Gesture Tuning Constants ---
+# Shared by the live controller (virtual_mandk.py) and the offline batch runner (batch_gestures.py).
+ZOOM_THRESHOLD = 30 # Reduced for persistence stability
+SLIDE_THRESHOLD = 40
+CLICK_DISTANCE = 40
+COOLDOWN_TIME = 0.5
+PERSISTENCE_FRAMES = 5 # How many frames a gesture must be held to trigger
+
+# Touchpad gesture events
+CLICK = 'CLICK'
+ZOOM_IN = 'ZOOM_IN'
+ZOOM_OUT = 'ZOOM_OUT'
+SWIPE_LEFT = 'SWIPE_LEFT'
+SWIPE_RIGHT = 'SWIPE_RIGHT'
+TOUCHPAD_EVENTS = [CLICK, ZOOM_IN, ZOOM_OUT, SWIPE_LEFT, SWIPE_RIGHT]
+
+
+def hand_to_pixels(hand_landmarks, frame_width, frame_height):
+    """Map the 21 MediaPipe hand landmarks to (x, y) pixel coordinates."""
+    return [(int(lm.x * frame_width), int(lm.y * frame_height)) for lm in hand_landmarks.landmark]
+
+
+def finger_states(lm_list):
+    """
+    Return (thumb_extended, index_extended, middle_extended, ring_curled, pinky_curled)
+    for a 21-point landmark list in pixel coordinates.
+    """
+    return (
+        lm_list[4][1] < lm_list[3][1],
+        lm_list[8][1] < lm_list[6][1],
+        lm_list[12][1] < lm_list[10][1],
+        lm_list[16][1] > lm_list[14][1],
+        lm_list[20][1] > lm_list[18][1],
+    )
+
+
+class TouchpadGestures:
+    """
+    Click, zoom and swipe detection for Touchpad Mode.
+
+    Holds the persistence counters between frames and reports which gestures fired,
+    leaving the actual mouse/keyboard dispatch to the caller.
+    """
+    def __init__(self, zoom_threshold=ZOOM_THRESHOLD, slide_threshold=SLIDE_THRESHOLD,
+                 click_distance=CLICK_DISTANCE, persistence_frames=PERSISTENCE_FRAMES,
+                 cooldown_time=COOLDOWN_TIME):
+        self.zoom_threshold = zoom_threshold
+        self.slide_threshold = slide_threshold
+        self.click_distance = click_distance
+        self.persistence_frames = persistence_frames
+        self.cooldown_time = cooldown_time
+        self.reset()
+
+    def reset(self):
+        """Forget any partially tracked zoom/swipe gesture."""
+        self.is_pinched = False
+        self.last_zoom_distance = 0
+        self.zoom_persistence_count = 0
+        self.gesture_start_x = None
+        self.gesture_start_y = None
+        self.swipe_persistence_count = 0
+
+    def update(self, lm_list, now, last_action_time, click_pose=False):
+        """
+        Process one frame of landmarks and return the list of gesture events that fired.
+
+        `now` is the frame timestamp in seconds and `last_action_time` the time of the last
+        triggered action. `click_pose` forces a click pinch for this frame regardless of the
+        thumb/index distance.
+        """
+        events = []
+        _, is_index_extended, is_middle_extended, is_ring_curled, is_pinky_curled = finger_states(lm_list)
+        ix, iy = lm_list[8]
+        tx, ty = lm_list[4]
+
+        # a) Left Click Gesture: Index + Thumb Pinch
+        click_distance = math.hypot(tx - ix, ty - iy)
+        self.is_pinched = click_distance < self.click_distance or click_pose
+
+        if self.is_pinched and now - last_action_time > self.cooldown_time:
+            events.append(CLICK)
+            last_action_time = now
+
+        # b) Zoom Gesture (Index + Thumb distance)
+        is_thumb_index_zoom_pose = is_index_extended and is_ring_curled and is_pinky_curled
+
+        if is_thumb_index_zoom_pose and now - last_action_time > 0.1:
+            current_zoom_distance = math.hypot(ix - tx, iy - ty)
+
+            if self.last_zoom_distance > 0:
+                delta_dist = current_zoom_distance - self.last_zoom_distance
+
+                if delta_dist > self.zoom_threshold:
+                    self.zoom_persistence_count += 1
+                elif delta_dist < -self.zoom_threshold:
+                    self.zoom_persistence_count -= 1
+                else:
+                    # Break if no significant movement
+                    self.zoom_persistence_count = 0
+
+                if self.zoom_persistence_count >= self.persistence_frames:
+                    events.append(ZOOM_IN) # Spread
+                    last_action_time = now
+                    self.zoom_persistence_count = 0 # Reset after action
+                elif self.zoom_persistence_count <= -self.persistence_frames:
+                    events.append(ZOOM_OUT) # Pinch
+                    last_action_time = now
+                    self.zoom_persistence_count = 0 # Reset after action
+
+            self.last_zoom_distance = current_zoom_distance
+        else:
+            self.last_zoom_distance = 0 # Reset tracking
+            self.zoom_persistence_count = 0
+
+        # c) Swipe Gesture (Index + Middle extended, horizontal movement)
+        is_swipe_gesture = is_index_extended and is_middle_extended and is_ring_curled and is_pinky_curled
+
+        if is_swipe_gesture:
+            mid_x = (ix + lm_list[12][0]) / 2
+            mid_y = (iy + lm_list[12][1]) / 2
+
+            if self.gesture_start_x is None:
+                self.gesture_start_x = mid_x
+                self.gesture_start_y = mid_y
+            else:
+                delta_x = mid_x - self.gesture_start_x
+                delta_y = mid_y - self.gesture_start_y # Track vertical stability
+
+                if abs(delta_y) < self.slide_threshold / 2: # Check vertical stability
+                    if delta_x > self.slide_threshold:
+                        self.swipe_persistence_count += 1
+                    elif delta_x < -self.slide_threshold:
+                        self.swipe_persistence_count -= 1
+                    else:
+                        self.swipe_persistence_count = 0
+
+                    # Trigger check
+                    if abs(self.swipe_persistence_count) >= self.persistence_frames:
+                        events.append(SWIPE_RIGHT if self.swipe_persistence_count > 0 else SWIPE_LEFT)
+                        last_action_time = now
+                        self.swipe_persistence_count = 0
+                        self.gesture_start_x = mid_x
+                        self.gesture_start_y = mid_y
+
+                else:
+                    self.swipe_persistence_count = 0
+                    self.gesture_start_x = None
+                    self.gesture_start_y = None
+
+        else:
+            self.gesture_start_x = None
+            self.gesture_start_y = None
+            self.swipe_persistence_count = 0
+
+        return events
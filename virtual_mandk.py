@@ -5,21 +5,33 @@ import numpy as np
 import math
 import time
 
+from gestures import (CLICK, COOLDOWN_TIME, PERSISTENCE_FRAMES, SWIPE_RIGHT, ZOOM_IN, ZOOM_OUT,
+                      TouchpadGestures, finger_states, hand_to_pixels)
+from gesture_templates import TemplateClassifier, normalize_landmarks
+
 # --- Constants and Initialization ---
 pyautogui.FAILSAFE = False
 
 # System Control Constants
-ZOOM_THRESHOLD = 30 # Reduced for persistence stability
-SLIDE_THRESHOLD = 40 
-CLICK_DISTANCE = 40 
-COOLDOWN_TIME = 0.5 
-PERSISTENCE_FRAMES = 5 # How many frames a gesture must be held to trigger
+# (Gesture thresholds live in gestures.py so the offline batch runner can share them.)
 BTN_W, BTN_H = 100, 40 
 
 # Drawing Constants
 DRAW_COLOR = (0, 255, 255) 
 DRAW_THICKNESS = 15
 
+# Custom Gesture Template Constants
+TEMPLATE_FILE = "gesture_templates.npz"
+TEMPLATE_CAPTURE_TOGGLE = 't' # Key that enters/leaves Template Capture Mode
+# Template actions (stored as the template labels in TEMPLATE_FILE)
+TEMPLATE_CLICK = 'CLICK'
+TEMPLATE_KBD = 'KBD'
+TEMPLATE_DRAW = 'DRAW'
+TEMPLATE_SAVE = 'SAVE'
+TEMPLATE_EXIT = 'EXIT'
+# Capture Mode key -> action triggered by the templates recorded with it
+TEMPLATE_CAPTURE_KEYS = {'1': TEMPLATE_CLICK, '2': TEMPLATE_KBD, '3': TEMPLATE_DRAW, '4': TEMPLATE_SAVE, '5': TEMPLATE_EXIT}
+
 # --- Button Class for Keyboard ---
 class Button:
     """A class to create and manage an on-screen button."""
@@ -190,13 +202,14 @@ def main():
     # Gesture tracking
     last_action_time = 0
     
-    # Cooldown variables for single-hand gestures
-    last_zoom_distance = 0
-    gesture_start_x = None
+    # Click/Zoom/Swipe tracking with persistence (Touchpad Mode)
+    touchpad = TouchpadGestures()
     
-    # NEW PERSISTENCE TRACKING
-    zoom_persistence_count = 0
-    swipe_persistence_count = 0
+    # Custom gesture templates (matched every frame, recorded in Template Capture Mode)
+    template_classifier = TemplateClassifier.load(TEMPLATE_FILE)
+    template_capture_active = False
+    template_label = None
+    template_persistence_count = 0
     
     # --- NEW: Re-add Camera Feed Display Constants ---
     CAM_W = 300
@@ -244,6 +257,9 @@ def main():
         elif is_drawing_mode_active:
              status_text = "STATUS: DRAWING MODE"
              status_color = (255, 255, 0) # Cyan
+        elif template_capture_active:
+            status_text = "STATUS: TEMPLATE CAPTURE"
+            status_color = (0, 165, 255) # Orange
         
         cv2.putText(desktop_canvas, status_text, (20, 45), cv2.FONT_HERSHEY_DUPLEX, 1, status_color, 2)
         
@@ -269,6 +285,15 @@ def main():
         # Draw border around embedded camera feed
         cv2.rectangle(desktop_canvas, (CAM_X, CAM_Y), (CAM_X + CAM_W, CAM_Y + CAM_H), (255, 255, 255), 2)
 
+        # --- Template Capture Mode Display ---
+        if template_capture_active:
+            template_counts = template_classifier.counts()
+            counts_text = " | ".join(f"{key}: {action} ({template_counts.get(action, 0)})" for key, action in TEMPLATE_CAPTURE_KEYS.items())
+            cv2.putText(desktop_canvas, counts_text, (NOTEPAD_X, frame_height - 60), cv2.FONT_HERSHEY_DUPLEX, 0.7, (0, 165, 255), 1)
+            cv2.putText(desktop_canvas, f"HOLD A POSE + PRESS 1-5: Record Template | {TEMPLATE_CAPTURE_TOGGLE.upper()}: Exit Capture", (NOTEPAD_X, frame_height - 20), cv2.FONT_HERSHEY_DUPLEX, 0.7, (255, 255, 255), 1)
+
+        template_features = None
+        template_action = None
 
         # --- Hand Landmark Processing & Control ---
         if hand_count > 0:
@@ -281,31 +306,36 @@ def main():
             h1 = results.multi_hand_landmarks[0]
             
             # Get all landmark lists for h1 (mapped to ORIGINAL frame coordinates)
-            lm_list = [(int(lm.x * frame_width), int(lm.y * frame_height)) for lm in h1.landmark]
+            lm_list = hand_to_pixels(h1, frame_width, frame_height)
             
             # Extract key tips (mapped to ORIGINAL frame coordinates)
             index_tip = h1.landmark[mp_hands.HandLandmark.INDEX_FINGER_TIP]
-            thumb_tip = h1.landmark[mp_hands.HandLandmark.THUMB_TIP]
             
             ix = int(index_tip.x * frame_width)
             iy = int(index_tip.y * frame_height)
-            tx = int(thumb_tip.x * frame_width)
-            ty = int(thumb_tip.y * frame_height)
+            
+            # --- Custom Gesture Templates: match the pose against the recorded library ---
+            # (Built from the camera image size; lm_list is stretched to the screen's aspect ratio)
+            template_features = normalize_landmarks(hand_to_pixels(h1, original_frame.shape[1], original_frame.shape[0]))
+            if not template_capture_active:
+                label = template_classifier.classify(template_features)
+                template_persistence_count = template_persistence_count + 1 if label is not None and label == template_label else 1
+                template_label = label
+                # Like the built-in gestures, a template must be held for a few frames to count
+                if template_label is not None and template_persistence_count >= PERSISTENCE_FRAMES:
+                    template_action = template_label
             
             # Cursor position (mapped to UI screen space for interaction with buttons)
             # When drawing on the desktop_canvas, we use (ix, iy). 
             
             # Check for general finger extensions/curls
             if len(lm_list) > 20:
-                is_thumb_extended = lm_list[4][1] < lm_list[3][1]
-                is_index_extended = lm_list[8][1] < lm_list[6][1]
-                is_middle_extended = lm_list[12][1] < lm_list[10][1]
-                is_ring_curled = lm_list[16][1] > lm_list[14][1]
-                is_pinky_curled = lm_list[20][1] > lm_list[18][1]
+                is_thumb_extended, is_index_extended, is_middle_extended, is_ring_curled, is_pinky_curled = finger_states(lm_list)
                 
                 # Global Exit Trigger: Thumbs Up 
                 is_thumbs_up_trigger = is_thumb_extended and not is_index_extended and \
                                        (lm_list[12][1] > lm_list[10][1]) and is_ring_curled and is_pinky_curled
+                is_thumbs_up_trigger = is_thumbs_up_trigger or template_action == TEMPLATE_EXIT
                 
                 # --- CONFIRMATION LOGIC CHECK (Handles YES/NO buttons) ---
                 if confirm_state is not None:
@@ -407,7 +437,7 @@ def main():
                         confirm_hover_start_time = 0
                 
                 # --- SET CONFIRMATION STATE LOGIC (Triggers) ---
-                if confirm_state is None and time.time() - last_action_time > COOLDOWN_TIME:
+                if confirm_state is None and not template_capture_active and time.time() - last_action_time > COOLDOWN_TIME:
                     
                     # 1. Thumbs Up Trigger (Exit Request for active modes)
                     if is_thumbs_up_trigger:
@@ -417,6 +447,11 @@ def main():
                             confirm_state = 'EXIT_DRAW'
                         last_action_time = time.time()
                     
+                    # 2. Custom Template Triggers (Entry Request, same as the mode switch buttons)
+                    elif template_action in (TEMPLATE_KBD, TEMPLATE_DRAW) and not keyboard_active and not is_drawing_mode_active:
+                        confirm_state = 'ENTER_KEYBOARD' if template_action == TEMPLATE_KBD else 'ENTER_DRAW'
+                        last_action_time = time.time()
+                    
                     # --- Mode Switch Button Hover Logic (NEW ENTRY TRIGGERS) ---
                     
                     if not keyboard_active and not is_drawing_mode_active:
@@ -475,6 +510,7 @@ def main():
                     prev_draw_point = None
 
                 is_two_finger_save_gesture = is_index_extended and is_middle_extended and is_ring_curled and is_pinky_curled
+                is_two_finger_save_gesture = is_two_finger_save_gesture or template_action == TEMPLATE_SAVE
 
                 if is_two_finger_save_gesture and confirm_state is None and time.time() - last_action_time > COOLDOWN_TIME:
                     file_path = f"drawing_{int(time.time())}.jpg"
@@ -493,7 +529,7 @@ def main():
                 desktop_canvas = cv2.addWeighted(desktop_canvas, 1, drawing_canvas, 1.0, 0)
                 
             # --- 2. Touchpad Mode Logic ---
-            if not is_drawing_mode_active and not keyboard_active:
+            if not is_drawing_mode_active and not keyboard_active and not template_capture_active:
                 
                 cv2.putText(desktop_canvas, "INDEX+THUMB: Click | INDEX+THUMB SPREAD/PINCH: Zoom | INDEX+MIDDLE: Swipe", (NOTEPAD_X, frame_height - 20), cv2.FONT_HERSHEY_DUPLEX, 0.7, (255, 255, 255), 1)
 
@@ -511,103 +547,29 @@ def main():
                 cv2.circle(desktop_canvas, (ix, iy), 10, (255, 255, 0), cv2.FILLED) 
                 
                 # --- Gesture Checks ---
-                if len(lm_list) > 20: 
-                    # a) Left Click Gesture: Index + Thumb Pinch
-                    click_distance = math.hypot(tx - ix, ty - iy)
+                if len(lm_list) > 20 and confirm_state is None:
+                    touchpad_events = touchpad.update(lm_list, time.time(), last_action_time, click_pose=template_action == TEMPLATE_CLICK)
 
-                    if click_distance < CLICK_DISTANCE and confirm_state is None:
+                    if touchpad.is_pinched:
                         cv2.circle(desktop_canvas, (ix, iy), 15, (0, 255, 255), cv2.FILLED) 
-                        if time.time() - last_action_time > COOLDOWN_TIME:
+
+                    for event in touchpad_events:
+                        if event == CLICK:
                             pyautogui.click()
-                            last_action_time = time.time()
                             time.sleep(0.1) 
-                    
-                    
-                    # b) Zoom Gesture (Index + Thumb distance) - ROBUSTIFIED
-                    is_thumb_index_zoom_pose = is_index_extended and is_ring_curled and is_pinky_curled
-
-                    if is_thumb_index_zoom_pose and confirm_state is None and time.time() - last_action_time > 0.1: 
-                        current_zoom_distance = math.hypot(ix - tx, iy - ty)
-                        
-                        if last_zoom_distance > 0:
-                            delta_dist = current_zoom_distance - last_zoom_distance
-                            
-                            if delta_dist > ZOOM_THRESHOLD:
-                                zoom_persistence_count += 1
-                                zoom_type = '+'
-                            elif delta_dist < -ZOOM_THRESHOLD:
-                                zoom_persistence_count -= 1
-                                zoom_type = '-'
-                            else:
-                                # Break if no significant movement
-                                zoom_persistence_count = 0 
-
-                            if zoom_persistence_count >= PERSISTENCE_FRAMES:
-                                pyautogui.hotkey('ctrl', zoom_type) # Zoom In (Spread)
-                                cv2.putText(desktop_canvas, f"ZOOM IN", (NOTEPAD_X, frame_height - 60), cv2.FONT_HERSHEY_DUPLEX, 2, (0, 255, 0), 3)
-                                last_action_time = time.time()
-                                zoom_persistence_count = 0 # Reset after action
-                            elif zoom_persistence_count <= -PERSISTENCE_FRAMES:
-                                pyautogui.hotkey('ctrl', zoom_type) # Zoom Out (Pinch)
-                                cv2.putText(desktop_canvas, f"ZOOM OUT", (NOTEPAD_X, frame_height - 60), cv2.FONT_HERSHEY_DUPLEX, 2, (0, 255, 0), 3)
-                                last_action_time = time.time()
-                                zoom_persistence_count = 0 # Reset after action
-                                
-                        last_zoom_distance = current_zoom_distance
-                    else:
-                        last_zoom_distance = 0 # Reset tracking
-                        zoom_persistence_count = 0
-                        
-
-                    # c) Swipe Gesture (Index + Middle extended, horizontal movement) - ROBUSTIFIED
-                    is_swipe_gesture = is_index_extended and is_middle_extended and is_ring_curled and is_pinky_curled
-                    
-                    if is_swipe_gesture and confirm_state is None:
-                        mid_x = (ix + (int(h1.landmark[mp_hands.HandLandmark.MIDDLE_FINGER_TIP].x * frame_width))) / 2
-                        mid_y = (iy + (int(h1.landmark[mp_hands.HandLandmark.MIDDLE_FINGER_TIP].y * frame_height))) / 2
-                        
-                        if gesture_start_x is None:
-                            gesture_start_x = mid_x
-                            gesture_start_y = mid_y
+                        elif event in (ZOOM_IN, ZOOM_OUT):
+                            pyautogui.hotkey('ctrl', '+' if event == ZOOM_IN else '-')
+                            cv2.putText(desktop_canvas, event.replace('_', ' '), (NOTEPAD_X, frame_height - 60), cv2.FONT_HERSHEY_DUPLEX, 2, (0, 255, 0), 3)
                         else:
-                            delta_x = mid_x - gesture_start_x
-                            delta_y = mid_y - gesture_start_y # Track vertical stability
-
-                            if abs(delta_y) < SLIDE_THRESHOLD / 2: # Check vertical stability
-                                if delta_x > SLIDE_THRESHOLD:
-                                    swipe_persistence_count += 1
-                                    swipe_direction = 'right'
-                                elif delta_x < -SLIDE_THRESHOLD:
-                                    swipe_persistence_count -= 1
-                                    swipe_direction = 'left'
-                                else:
-                                    swipe_persistence_count = 0
-                                
-                                # Trigger check
-                                if swipe_persistence_count >= PERSISTENCE_FRAMES:
-                                    pyautogui.hotkey('alt', swipe_direction)
-                                    cv2.putText(desktop_canvas, f"SWIPE {swipe_direction.upper()}", (NOTEPAD_X, frame_height - 60), cv2.FONT_HERSHEY_DUPLEX, 2, (255, 165, 0), 3)
-                                    last_action_time = time.time()
-                                    swipe_persistence_count = 0
-                                    gesture_start_x = mid_x 
-                                    gesture_start_y = mid_y
-                                elif swipe_persistence_count <= -PERSISTENCE_FRAMES:
-                                    pyautogui.hotkey('alt', swipe_direction)
-                                    cv2.putText(desktop_canvas, f"SWIPE {swipe_direction.upper()}", (NOTEPAD_X, frame_height - 60), cv2.FONT_HERSHEY_DUPLEX, 2, (255, 165, 0), 3)
-                                    last_action_time = time.time()
-                                    swipe_persistence_count = 0
-                                    gesture_start_x = mid_x 
-                                    gesture_start_y = mid_y
-
-                            else:
-                                swipe_persistence_count = 0
-                                gesture_start_x = None
-                                gesture_start_y = None
-                                
-                    else:
-                        gesture_start_x = None 
-                        gesture_start_y = None
-                        swipe_persistence_count = 0
+                            swipe_direction = 'right' if event == SWIPE_RIGHT else 'left'
+                            pyautogui.hotkey('alt', swipe_direction)
+                            cv2.putText(desktop_canvas, event.replace('_', ' '), (NOTEPAD_X, frame_height - 60), cv2.FONT_HERSHEY_DUPLEX, 2, (255, 165, 0), 3)
+                        last_action_time = time.time()
+                else:
+                    touchpad.reset()
+            else:
+                # --- Reset Gestures when Touchpad Mode is not active ---
+                touchpad.reset()
             
             # --- 3. Virtual Keyboard Logic (if active) ---
             if keyboard_active:
@@ -657,18 +619,34 @@ def main():
                     hovered_button = None
                     hover_start_time = 0
             
-            # --- 4. Reset Gestures if hand is not detected or in keyboard mode ---
-            else:
-                last_zoom_distance = 0
-                gesture_start_x = None
-                zoom_persistence_count = 0
-                swipe_persistence_count = 0
+        else:
+            # --- Reset Gestures if hand is not detected ---
+            touchpad.reset()
+            template_label = None
+            template_persistence_count = 0
 
         # Display the final desktop hub canvas
         cv2.imshow("Virtual Controller", desktop_canvas)
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+        key = cv2.waitKey(1) & 0xFF
+        if key == ord('q'):
             break
 
+        # --- Template Capture Keys (Touchpad Mode only) ---
+        if key == ord(TEMPLATE_CAPTURE_TOGGLE) and not keyboard_active and not is_drawing_mode_active and confirm_state is None:
+            template_capture_active = not template_capture_active
+            template_label = None
+            template_persistence_count = 0
+        elif template_capture_active and chr(key) in TEMPLATE_CAPTURE_KEYS:
+            if template_features is None:
+                print("No hand detected, template not recorded.")
+            else:
+                template_classifier.add(TEMPLATE_CAPTURE_KEYS[chr(key)], template_features)
+                try:
+                    template_classifier.save(TEMPLATE_FILE)
+                    print(f"Template '{TEMPLATE_CAPTURE_KEYS[chr(key)]}' saved to {TEMPLATE_FILE}")
+                except Exception as e:
+                    print(f"Error saving templates: {e}")
+
     # --- Cleanup ---
     cap.release()
     cv2.destroyAllWindows()